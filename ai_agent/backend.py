@@ -1,11 +1,6 @@
 import os
-import pandas as pd
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
-from langchain_community.utilities import SQLDatabase
-from langchain_openai import ChatOpenAI
-from langchain_community.agent_toolkits import create_sql_agent
-from analytics.graph_algo import SuspiciousBehaviorDetector
 
 class AnalyticsAgent:
     def __init__(self, api_key=None):
@@ -19,6 +14,10 @@ class AnalyticsAgent:
             return 'AI features require an OPENAI_API_KEY in your .env file.'
             
         try:
+            from langchain_community.utilities import SQLDatabase
+            from langchain_community.agent_toolkits import create_sql_agent
+            from langchain_openai import ChatOpenAI
+
             db = SQLDatabase.from_uri(self.db_url)
             llm = ChatOpenAI(temperature=0, model="gpt-4", api_key=self.api_key)
             
@@ -39,35 +38,58 @@ class AnalyticsAgent:
             return 'AI features require an OPENAI_API_KEY in your .env file.'
             
         try:
-            query = "SELECT sender, amount, timestamp FROM transactions WHERE sender = %(addr)s ORDER BY timestamp"
-            
-            df = pd.read_sql(query, self.engine, params={"addr": address})
+            from langchain_openai import ChatOpenAI
+            from analytics.graph_algo import SuspiciousBehaviorDetector
+
+            from analytics.columnar import get_columnar_store
+
+            df, detector = None, None
+            columnar = get_columnar_store(self.engine)
+            if columnar:
+                try:
+                    columnar.sync_from_postgres()
+                    df = columnar.address_transactions(address)
+                    detector = columnar.load_detector(address=address)
+                except Exception as e:
+                    print(f"Columnar profile failed ({e}); using PostgreSQL.")
+                    df, detector = None, None
+
+            if df is None or df.empty:
+                from database.archive import TieredTransactions, default_archive
+
+                tiers = TieredTransactions(self.engine, default_archive(self.engine))
+                df = tiers.read(sender=address, columns=['sender', 'amount', 'timestamp'])
+                df = df.sort_values('timestamp').reset_index(drop=True)
+                detector = None
             
             if df.empty:
                 return f"No transactions found for address {address}"
             
-            total_volume = df['amount'].sum()
+            from database.schema import UBBN_PER_BBN
+
+            total_volume = df['amount'].sum() / UBBN_PER_BBN
             days_active = (df['timestamp'].max() - df['timestamp'].min()).days or 1
             frequency = len(df) / days_active
-            avg_tx_size = df['amount'].mean()
+            avg_tx_size = df['amount'].mean() / UBBN_PER_BBN
             
-            detector = SuspiciousBehaviorDetector()
-            for _, row in df.iterrows():
-                detector.add_transaction(
-                    row['sender'], 
-                    "unknown_receiver", 
-                    row['amount'], 
-                    row['timestamp']
-                )
+            if detector is None:
+                detector = SuspiciousBehaviorDetector()
+                for _, row in df.iterrows():
+                    detector.add_transaction(
+                        row['sender'], 
+                        "unknown_receiver", 
+                        row['amount'], 
+                        row['timestamp']
+                    )
             
             wash_trades = detector.detect_wash_trading()
             fan_outs = detector.detect_fan_out(min_recipients=1) 
             
             stats = f"""
             Address: {address}
-            Total Volume: {total_volume:,.2f}
+            Total Volume: {total_volume:,.2f} BBN
             Transaction Frequency: {frequency:.2f} txs/day
-            Average Transaction Size: {avg_tx_size:,.2f}
+            Average Transaction Size: {avg_tx_size:,.2f} BBN
             Total Transactions: {len(df)}
             Suspicious Cycles Detected: {len(wash_trades)}
             Fan-out Patterns Detected: {len(fan_outs)}
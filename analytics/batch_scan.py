@@ -0,0 +1,273 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import click
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.schema import Base, Transaction, ScanCheckpoint, DetectorFinding, ensure_indexes
+from database.archive import TieredTransactions, TransactionArchive, default_archive
+from analytics.graph_algo import SuspiciousBehaviorDetector
+
+
+class BatchScanner:
+    """
+    Streams the transactions table in (timestamp, id) order through a server-side
+    cursor and feeds every detector in a single pass.
+
+    Memory stays bounded because the detector only ever holds the trailing
+    fan-out window and cycle window. Progress is checkpointed after every chunk,
+    and findings are upserted so a resumed scan never writes duplicates.
+    """
+
+    def __init__(self, engine, scan_name="full_history", chunk_size=5000,
+                 fan_out_window_minutes=60, min_recipients=10, min_amount=0,
+                 cycle_window_hours=24, max_cycle_length=10, archive=None, columnar=None):
+        self.engine = engine
+        self.columnar = columnar
+        self.archive = archive or default_archive(engine)
+        self.scan_name = scan_name
+        self.chunk_size = chunk_size
+        self.fan_out_window_minutes = fan_out_window_minutes
+        self.fan_out_window = timedelta(minutes=fan_out_window_minutes)
+        self.min_recipients = min_recipients
+        self.min_amount = min_amount
+        self.cycle_window = timedelta(hours=cycle_window_hours)
+        self.max_cycle_length = max_cycle_length
+        self.detector = SuspiciousBehaviorDetector()
+
+    def load_checkpoint(self):
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(ScanCheckpoint.last_timestamp, ScanCheckpoint.last_id)
+                .where(ScanCheckpoint.scan_name == self.scan_name)
+            ).first()
+        return (row.last_timestamp, row.last_id) if row else None
+
+    def stream_archived_chunks(self, start_after=None):
+        """
+        Yield transfer rows from archived height buckets, one bucket at a time, merged with
+        any hot rows backfilled into those heights. Buckets are read in height order.
+        """
+        tiers = TieredTransactions(self.engine, self.archive)
+        columns = ['id', 'timestamp', 'sender', 'amount', 'details', 'tx_type']
+        for bucket in self.archive.archived_buckets():
+            df = tiers.read(bucket, bucket + self.archive.bucket_size - 1, columns=columns)
+            df = df[df['tx_type'] == "Transfer"].dropna(subset=['timestamp'])
+            df = df.sort_values(['timestamp', 'id'])
+            if start_after:
+                ts, last_id = start_after
+                df = df[(df['timestamp'] > ts) | ((df['timestamp'] == ts) & (df['id'] > last_id))]
+            rows = list(df.itertuples(index=False))
+            for i in range(0, len(rows), self.chunk_size):
+                yield rows[i:i + self.chunk_size]
+
+    def stream_chunks(self, start_after=None):
+        """
+        Yield lists of transfer rows, chunk_size at a time, ordered by (timestamp, id).
+        Archived history comes first, then the hot table above the archive. With a
+        columnar store, rows come from its local copy instead of PostgreSQL.
+        """
+        if self.columnar is not None:
+            yield from self.columnar.iter_transfers(start_after, chunk_size=self.chunk_size)
+            return
+
+        ceiling = self.archive.ceiling()
+        if ceiling is not None:
+            yield from self.stream_archived_chunks(start_after)
+
+        query = (
+            select(Transaction.id, Transaction.timestamp, Transaction.sender,
+                   Transaction.amount, Transaction.details)
+            .where(Transaction.tx_type == "Transfer")
+            .order_by(Transaction.timestamp, Transaction.id)
+        )
+        if start_after:
+            query = query.where(tuple_(Transaction.timestamp, Transaction.id) > tuple_(*start_after))
+        if ceiling is not None:
+            query = query.where(Transaction.height >= ceiling)
+
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=self.chunk_size).execute(query)
+            for chunk in result.partitions():
+                yield chunk
+
+    def feed(self, rows):
+        """
+        Add rows to the detector one at a time and return the cycles each one closed.
+
+        Cycles are searched right after their closing transfer is added, over edges used
+        within cycle_window before it, so what is found does not depend on chunk size.
+        """
+        cycles = []
+        for row in rows:
+            recipient = getattr(row, 'recipient', None)
+            if recipient is None:
+                details = getattr(row, 'details', None)
+                recipient = details.get('recipient') if isinstance(details, dict) else None
+            if not row.sender or not recipient or row.timestamp is None:
+                continue
+            amount = row.amount or 0
+            # Archived rows come back as numpy scalars, which the JSON findings column can't store
+            amount = amount.item() if hasattr(amount, 'item') else amount
+            self.detector.add_transaction(row.sender, recipient, amount, row.timestamp)
+            cycles.extend(self.detector.detect_wash_trading(
+                max_cycle_length=self.max_cycle_length,
+                new_edges=[(row.sender, recipient)],
+                since=row.timestamp - self.cycle_window,
+            ))
+        return cycles
+
+    def collect_findings(self, horizon=None, cycles=()):
+        """
+        Run the fan-out detector over the current window and add the cycles closed by
+        the latest chunk (see feed). horizon=None flushes open fan-out windows too.
+        """
+        findings = []
+
+        for pattern in self.detector.detect_fan_out(
+            time_window_minutes=self.fan_out_window_minutes,
+            min_recipients=self.min_recipients,
+            min_amount=self.min_amount,
+            window_start_before=horizon,
+        ):
+            findings.append({
+                "detector": "fan_out",
+                "finding_key": f"{pattern['sender']}|{pattern['time_window']}",
+                "address": pattern['sender'],
+                "score": float(pattern['recipient_count']),
+                "details": pattern,
+            })
+
+        for cycle in cycles:
+            nodes = cycle['cycle']
+            start = nodes.index(min(nodes))
+            canonical = nodes[start:] + nodes[:start]
+            findings.append({
+                "detector": "wash_trading",
+                "finding_key": "->".join(canonical),
+                "address": canonical[0],
+                "score": float(cycle['total_volume']),
+                "details": cycle,
+            })
+
+        return findings
+
+    def commit_chunk(self, findings, last_row):
+        """Write findings and advance the checkpoint in one transaction. Returns the number written."""
+        now = datetime.now()
+        # One INSERT cannot upsert the same key twice
+        findings = list({(f['detector'], f['finding_key']): f for f in findings}.values())
+        with self.engine.begin() as conn:
+            if findings:
+                stmt = insert(DetectorFinding).values([
+                    dict(f, scan_name=self.scan_name, detected_at=now) for f in findings
+                ])
+                conn.execute(stmt.on_conflict_do_update(
+                    constraint='uq_detector_findings_key',
+                    set_={
+                        "score": stmt.excluded.score,
+                        "details": stmt.excluded.details,
+                        "detected_at": stmt.excluded.detected_at,
+                    },
+                ))
+            if last_row is not None:
+                stmt = insert(ScanCheckpoint).values(
+                    scan_name=self.scan_name,
+                    last_id=last_row.id,
+                    last_timestamp=last_row.timestamp,
+                    updated_at=now,
+                )
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=[ScanCheckpoint.scan_name],
+                    set_={
+                        "last_id": stmt.excluded.last_id,
+                        "last_timestamp": stmt.excluded.last_timestamp,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                ))
+        return len(findings)
+
+    def run(self, resume=True):
+        start_after = None
+        checkpoint = self.load_checkpoint() if resume else None
+        if checkpoint:
+            # Rewind by the widest window so the detector state around the
+            # checkpoint is rebuilt; re-found patterns are upserted, not duplicated.
+            last_ts, _ = checkpoint
+            start_after = (last_ts - max(self.fan_out_window, self.cycle_window), 0)
+            print(f"Resuming '{self.scan_name}' from {last_ts}")
+
+        total_rows = 0
+        total_findings = 0
+        last_row = None
+
+        for chunk in self.stream_chunks(start_after):
+            cycles = self.feed(chunk)
+            last_row = chunk[-1]
+            total_rows += len(chunk)
+
+            horizon = last_row.timestamp - self.fan_out_window
+            findings = self.collect_findings(horizon=horizon, cycles=cycles)
+            total_findings += self.commit_chunk(findings, last_row)
+
+            self.detector.prune_before(horizon, edge_cutoff=last_row.timestamp - self.cycle_window)
+            print(f"Scanned {total_rows} rows (up to {last_row.timestamp}), {total_findings} findings", end="\r")
+
+        findings = self.collect_findings()
+        total_findings += self.commit_chunk(findings, last_row)
+
+        print(f"\nScan '{self.scan_name}' complete: {total_rows} rows, {total_findings} findings")
+        return total_findings
+
+
+@click.command()
+@click.option("--scan-name", default="full_history", help="Checkpoint name; reuse it to resume a scan.")
+@click.option("--chunk-size", default=5000, show_default=True, help="Rows fetched per server-side cursor batch.")
+@click.option("--fan-out-window", default=60, show_default=True, help="Fan-out time window in minutes.")
+@click.option("--min-recipients", default=10, show_default=True)
+@click.option("--min-amount", default=0, show_default=True)
+@click.option("--cycle-window", default=24, show_default=True, help="Only look for cycles closed within this many hours.")
+@click.option("--restart", is_flag=True, help="Ignore any existing checkpoint and scan from the beginning.")
+@click.option("--archive-dir", default=None, envvar="ARCHIVE_DIR", help="Cold tier to scan before the hot table.")
+@click.option("--engine", "source", type=click.Choice(["postgres", "duckdb"]), default="postgres", show_default=True,
+              help="duckdb: sync the columnar store, then load detector input from it.")
+def main(scan_name, chunk_size, fan_out_window, min_recipients, min_amount, cycle_window, restart, archive_dir, source):
+    load_dotenv()
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise click.ClickException("DATABASE_URL not found in .env")
+
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    ensure_indexes(engine)
+    archive = TransactionArchive(engine, root=archive_dir) if archive_dir else None
+
+    columnar = None
+    if source == "duckdb":
+        from analytics.columnar import ColumnarStore, DEFAULT_COLUMNAR_PATH
+
+        columnar = ColumnarStore(engine, path=os.getenv("COLUMNAR_DB_PATH", DEFAULT_COLUMNAR_PATH))
+        if archive_dir:
+            columnar.sync_from_archive(archive_dir)
+        columnar.sync_from_postgres()
+
+    scanner = BatchScanner(
+        engine,
+        scan_name=scan_name,
+        chunk_size=chunk_size,
+        fan_out_window_minutes=fan_out_window,
+        min_recipients=min_recipients,
+        min_amount=min_amount,
+        cycle_window_hours=cycle_window,
+        archive=archive,
+        columnar=columnar,
+    )
+    scanner.run(resume=not restart)
+
+
+if __name__ == "__main__":
+    main()
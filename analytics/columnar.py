@@ -0,0 +1,326 @@
+import glob
+import importlib.util
+import os
+import sys
+import threading
+from collections import namedtuple
+
+import click
+import pandas as pd
+from sqlalchemy import text
+
+DEFAULT_COLUMNAR_PATH = "analytics.duckdb"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id BIGINT,
+    tx_hash VARCHAR,
+    height BIGINT,
+    sender VARCHAR,
+    recipient VARCHAR,
+    amount DOUBLE,
+    timestamp TIMESTAMP,
+    tx_type VARCHAR
+)
+"""
+_COLUMNS = ['id', 'tx_hash', 'height', 'sender', 'recipient', 'amount', 'timestamp', 'tx_type']
+
+TransferRow = namedtuple('TransferRow', ['id', 'timestamp', 'sender', 'recipient', 'amount'])
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def columnar_enabled():
+    # find_spec keeps duckdb itself unimported until a store is actually opened
+    return os.getenv("ANALYTICS_ENGINE", "").lower() == "duckdb" and importlib.util.find_spec("duckdb") is not None
+
+
+def get_columnar_store(engine=None):
+    """
+    The process-wide ColumnarStore when ANALYTICS_ENGINE=duckdb and duckdb is installed.
+    Returns None when the mode is off or the DuckDB file is locked by another process.
+    """
+    if not columnar_enabled():
+        return None
+
+    path = os.getenv("COLUMNAR_DB_PATH", DEFAULT_COLUMNAR_PATH)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            try:
+                store = _stores[path] = ColumnarStore(engine, path=path)
+            except Exception as e:
+                print(f"Columnar store unavailable ({e}); using PostgreSQL.")
+                return None
+        if store.engine is None:
+            store.engine = engine
+        return store
+
+
+class ColumnarStore:
+    """
+    Embedded DuckDB copy of the transactions table for scan-heavy aggregates.
+
+    It is filled incrementally from PostgreSQL (rows with an id above the last one
+    synced) and/or from the Parquet archive, so aggregates stop competing with the
+    indexer's writes. The recipient is pulled out of the details JSON at sync time
+    so edge extraction is a plain column scan. Rows are upserted on tx_hash, so
+    resync() picks up rows rewritten in place (e.g. by an indexer replay). Rows
+    deleted from PostgreSQL (e.g. by a reseed) only go away with rebuild().
+    """
+
+    def __init__(self, engine=None, path=DEFAULT_COLUMNAR_PATH):
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("duckdb is required for the columnar analytics engine (pip install duckdb)")
+        self.engine = engine
+        self.path = path
+        self.con = duckdb.connect(path)
+        self.con.execute(_SCHEMA)
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sync_thread = None
+
+    def _cursor(self):
+        # DuckDB connections are not thread-safe; each call gets its own cursor
+        return self.con.cursor()
+
+    # --- Sync ---
+
+    def last_synced_id(self):
+        return self._cursor().execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+
+    def row_count(self):
+        return self._cursor().execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def sync_from_postgres(self, batch_size=50_000):
+        """Copy rows newer than the last synced id from the PostgreSQL transactions table"""
+        with self._sync_lock:
+            return self._copy_from_postgres(self.last_synced_id(), batch_size=batch_size)
+
+    def resync(self, min_height=None, max_height=None, batch_size=50_000):
+        """Re-copy every PostgreSQL row in a height range, replacing the local copies by tx_hash"""
+        with self._sync_lock:
+            return self._copy_from_postgres(0, min_height, max_height, batch_size)
+
+    def _copy_from_postgres(self, last_id, min_height=None, max_height=None, batch_size=50_000):
+        if self.engine is None:
+            raise ValueError("syncing from PostgreSQL needs a SQLAlchemy engine")
+
+        clauses, params = ["id > :last_id"], {"limit": batch_size}
+        if min_height is not None:
+            clauses.append("height >= :min_height")
+            params["min_height"] = min_height
+        if max_height is not None:
+            clauses.append("height <= :max_height")
+            params["max_height"] = max_height
+        query = text(
+            "SELECT id, tx_hash, height, sender, details, amount, timestamp, tx_type "
+            f"FROM transactions WHERE {' AND '.join(clauses)} ORDER BY id LIMIT :limit"
+        )
+
+        copied = 0
+        while True:
+            with self.engine.connect() as conn:
+                batch = pd.read_sql(query, conn, params=dict(params, last_id=last_id))
+            if batch.empty:
+                break
+            self._upsert(batch)
+            last_id = int(batch['id'].max())
+            copied += len(batch)
+        return copied
+
+    def sync_from_archive(self, archive_root):
+        """Load Parquet archive files (database/archive.py) not already present, matched on tx_hash"""
+        with self._sync_lock:
+            return self._load_archive(archive_root)
+
+    def rebuild(self, archive_root=None, batch_size=50_000):
+        """Drop the local copy and reload it from the archive (if given) and PostgreSQL"""
+        with self._sync_lock:
+            self._cursor().execute("DELETE FROM transactions")
+            archived = self._load_archive(archive_root) if archive_root else 0
+            return archived + self._copy_from_postgres(0, batch_size=batch_size)
+
+    def _load_archive(self, archive_root):
+        pattern = os.path.join(archive_root, "height_bucket=*", "data.parquet")
+        if not glob.glob(pattern):
+            return 0
+        cur = self._cursor()
+        before = cur.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        cur.execute(f"""
+            INSERT INTO transactions
+            SELECT a.id, a.tx_hash, a.height, a.sender,
+                   json_extract_string(a.details, '$.recipient'),
+                   a.amount, a.timestamp, a.tx_type
+            FROM read_parquet('{pattern}') a
+            ANTI JOIN transactions t ON t.tx_hash = a.tx_hash
+        """)
+        return cur.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] - before
+
+    def _upsert(self, batch):
+        batch = batch.copy()
+        batch['recipient'] = batch['details'].apply(lambda d: d.get('recipient') if isinstance(d, dict) else None)
+        batch['amount'] = batch['amount'].astype(float)
+        frame = batch[_COLUMNS]
+        cur = self._cursor()
+        cur.register("sync_batch", frame)
+        try:
+            cur.execute("BEGIN TRANSACTION")
+            cur.execute("DELETE FROM transactions WHERE tx_hash IN (SELECT tx_hash FROM sync_batch)")
+            cur.execute(f"INSERT INTO transactions SELECT {', '.join(_COLUMNS)} FROM sync_batch")
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        finally:
+            cur.unregister("sync_batch")
+
+    def start_background_sync(self, interval=30.0):
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            return self
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.sync_from_postgres()
+                except Exception as e:
+                    print(f"Columnar sync failed: {e}")
+                self._stop.wait(interval)
+
+        self._sync_thread = threading.Thread(target=loop, name="columnar-sync", daemon=True)
+        self._sync_thread.start()
+        return self
+
+    # --- Aggregates ---
+
+    def summary(self, whale_threshold=4000):
+        """Totals in BBN (the copy keeps the table's ubbn amounts)"""
+        from database.schema import UBBN_PER_BBN
+
+        row = self._cursor().execute("""
+            SELECT COUNT(*), COALESCE(SUM(amount), 0) / ?, COUNT(*) FILTER (WHERE amount > ?)
+            FROM transactions
+        """, [UBBN_PER_BBN, whale_threshold * UBBN_PER_BBN]).fetchone()
+        return {"transactions": row[0], "volume": row[1], "whales": row[2]}
+
+    def daily_volume(self):
+        from database.schema import UBBN_PER_BBN
+
+        return self._cursor().execute("""
+            SELECT CAST(timestamp AS DATE) AS date, SUM(amount) / ? AS amount
+            FROM transactions GROUP BY 1 ORDER BY 1
+        """, [UBBN_PER_BBN]).df()
+
+    def tx_type_counts(self):
+        return self._cursor().execute("""
+            SELECT COALESCE(tx_type, 'Unknown') AS Type, COUNT(*) AS Count
+            FROM transactions GROUP BY 1 ORDER BY 2 DESC
+        """).df()
+
+    def address_transactions(self, address):
+        return self._cursor().execute(
+            "SELECT sender, amount, timestamp FROM transactions WHERE sender = ? ORDER BY timestamp",
+            [address],
+        ).df()
+
+    def address_stats(self, limit=100):
+        return self._cursor().execute("""
+            SELECT sender,
+                   COUNT(*) AS tx_count,
+                   SUM(amount) AS total_volume,
+                   AVG(amount) AS avg_amount,
+                   MIN(timestamp) AS first_seen,
+                   MAX(timestamp) AS last_seen
+            FROM transactions GROUP BY sender ORDER BY total_volume DESC LIMIT ?
+        """, [limit]).df()
+
+    def transfer_edges(self, start=None, end=None, address=None):
+        """Sender -> recipient edges in time order, optionally only those touching address"""
+        clauses, params = ["tx_type = 'Transfer'", "recipient IS NOT NULL"], []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp <= ?")
+            params.append(end)
+        if address is not None:
+            clauses.append("(sender = ? OR recipient = ?)")
+            params.extend([address, address])
+        return self._cursor().execute(f"""
+            SELECT sender, recipient, amount, timestamp FROM transactions
+            WHERE {' AND '.join(clauses)} ORDER BY timestamp
+        """, params).df()
+
+    def iter_transfers(self, start_after=None, chunk_size=5000):
+        """Stream transfer edges ordered by (timestamp, id) in chunks, for the batch scan"""
+        clauses, params = ["tx_type = 'Transfer'", "recipient IS NOT NULL", "timestamp IS NOT NULL"], []
+        if start_after:
+            clauses.append("(timestamp, id) > (?, ?)")
+            params.extend(start_after)
+        cur = self._cursor()
+        cur.execute(f"""
+            SELECT id, timestamp, sender, recipient, amount FROM transactions
+            WHERE {' AND '.join(clauses)} ORDER BY timestamp, id
+        """, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [TransferRow(*row) for row in rows]
+
+    def load_detector(self, start=None, end=None, address=None):
+        from analytics.graph_algo import SuspiciousBehaviorDetector
+
+        detector = SuspiciousBehaviorDetector()
+        for row in self.transfer_edges(start, end, address).itertuples(index=False):
+            detector.add_transaction(row.sender, row.recipient, row.amount, row.timestamp)
+        return detector
+
+
+@click.group()
+def cli():
+    """Embedded columnar copy of the transactions table."""
+
+
+def _open_store():
+    from dotenv import load_dotenv
+    from sqlalchemy import create_engine
+
+    load_dotenv()
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise click.ClickException("DATABASE_URL not found in .env")
+    return ColumnarStore(create_engine(db_url), path=os.getenv("COLUMNAR_DB_PATH", DEFAULT_COLUMNAR_PATH))
+
+
+@cli.command()
+@click.option("--archive-dir", default=None, envvar="ARCHIVE_DIR", help="Also load archived Parquet history.")
+def sync(archive_dir):
+    """Copy new PostgreSQL rows (and optionally the archive) into the store."""
+    store = _open_store()
+    if archive_dir:
+        print(f"Loaded {store.sync_from_archive(archive_dir)} archived rows.")
+    print(f"Synced {store.sync_from_postgres()} new rows.")
+
+
+@cli.command()
+@click.option("--from-height", type=int, default=None)
+@click.option("--to-height", type=int, default=None)
+def resync(from_height, to_height):
+    """Replace local copies of a height range, e.g. after an indexer replay rewrote it."""
+    print(f"Resynced {_open_store().resync(from_height, to_height)} rows.")
+
+
+@cli.command()
+@click.option("--archive-dir", default=None, envvar="ARCHIVE_DIR", help="Also load archived Parquet history.")
+def rebuild(archive_dir):
+    """Recreate the store from scratch, dropping rows deleted from PostgreSQL."""
+    print(f"Rebuilt the store with {_open_store().rebuild(archive_dir)} rows.")
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    cli()
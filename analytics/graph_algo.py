@@ -17,12 +17,80 @@ class SuspiciousBehaviorDetector:
             'timestamp': timestamp
         })
     
-    def detect_wash_trading(self, min_cycle_length=2, max_cycle_length=10):
-        """Detect potential wash trading by finding cycles in the transaction graph"""
+    def _edge_recent(self, u, v, since):
+        return since is None or self.graph[u][v]['timestamp'] >= since
+    
+    def _paths_back(self, start, target, max_edges, since=None):
+        """Simple paths start -> target of at most max_edges edges, using only recent edges"""
+        # Hop distances to target (over reversed recent edges) prune every branch that
+        # cannot get back in time, so the search only walks paths that close a cycle
+        dist = {target: 0}
+        frontier = [target]
+        for d in range(1, max_edges + 1):
+            next_frontier = []
+            for v in frontier:
+                for u in self.graph.predecessors(v):
+                    if u not in dist and self._edge_recent(u, v, since):
+                        dist[u] = d
+                        next_frontier.append(u)
+            frontier = next_frontier
+        if start not in dist:
+            return
+        
+        path = [start]
+        on_path = {start}
+        stack = [iter(self.graph.successors(start))]
+        while stack:
+            v = path[-1]
+            w = next(stack[-1], None)
+            if w is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            if w in on_path or not self._edge_recent(v, w, since):
+                continue
+            if w == target:
+                yield path + [target]
+                continue
+            if dist.get(w, max_edges + 1) <= max_edges - len(path):
+                path.append(w)
+                on_path.add(w)
+                stack.append(iter(self.graph.successors(w)))
+    
+    def _cycles_through(self, edges, max_cycle_length, since=None):
+        """Cycles that contain at least one of the given edges, each reported once"""
+        seen = set()
+        for from_node, to_node in edges:
+            if from_node == to_node or not self.graph.has_edge(from_node, to_node):
+                continue
+            if not self._edge_recent(from_node, to_node, since):
+                continue
+            # Every path back from to_node to from_node closes a cycle over this edge
+            for path in self._paths_back(to_node, from_node, max_cycle_length - 1, since):
+                cycle = [from_node] + path[:-1]
+                start = cycle.index(min(cycle))
+                canonical = tuple(cycle[start:] + cycle[:start])
+                if canonical not in seen:
+                    seen.add(canonical)
+                    yield list(canonical)
+    
+    def detect_wash_trading(self, min_cycle_length=2, max_cycle_length=10, new_edges=None, since=None):
+        """Detect potential wash trading by finding cycles in the transaction graph.
+        
+        With new_edges, only cycles that pass through one of those (from, to) edges are
+        searched for, which keeps incremental scans from re-enumerating the whole graph.
+        With since, every edge of a cycle must have been used at or after that time.
+        """
         suspicious_cycles = []
         
         try:
-            cycles = list(nx.simple_cycles(self.graph))
+            if new_edges is not None:
+                cycles = self._cycles_through(new_edges, max_cycle_length, since)
+            else:
+                graph = self.graph
+                if since is not None:
+                    graph = nx.subgraph_view(graph, filter_edge=lambda u, v: self._edge_recent(u, v, since))
+                cycles = nx.simple_cycles(graph, length_bound=max_cycle_length)
             
             for cycle in cycles:
                 if min_cycle_length <= len(cycle) <= max_cycle_length:
@@ -44,8 +112,21 @@ class SuspiciousBehaviorDetector:
         
         return sorted(suspicious_cycles, key=lambda x: x['total_volume'], reverse=True)
     
-    def detect_fan_out(self, time_window_minutes=60, min_recipients=10, min_amount=0):
-        """Detect fan-out patterns where wallets send to many addresses quickly"""
+    def prune_before(self, cutoff, edge_cutoff=None):
+        """Drop transactions older than cutoff (and graph edges older than edge_cutoff) to bound memory"""
+        self.transactions = [tx for tx in self.transactions if tx['timestamp'] >= cutoff]
+        
+        if edge_cutoff is not None:
+            stale = [(u, v) for u, v, ts in self.graph.edges(data='timestamp') if ts < edge_cutoff]
+            self.graph.remove_edges_from(stale)
+            self.graph.remove_nodes_from([n for n in list(self.graph.nodes) if self.graph.degree(n) == 0])
+    
+    def detect_fan_out(self, time_window_minutes=60, min_recipients=10, min_amount=0, window_start_before=None):
+        """Detect fan-out patterns where wallets send to many addresses quickly.
+        
+        window_start_before restricts the scan to windows that start before that time,
+        i.e. windows that are already complete when transactions arrive in time order.
+        """
         fan_out_patterns = []
         sender_activity = defaultdict(list)
         
@@ -58,6 +139,11 @@ class SuspiciousBehaviorDetector:
             
             for i in range(len(txs)):
                 window_start = txs[i]['timestamp']
+                if i > 0 and txs[i - 1]['timestamp'] == window_start:
+                    # Same start as the previous window, which already covered these txs
+                    continue
+                if window_start_before is not None and window_start >= window_start_before:
+                    break
                 window_end = window_start + timedelta(minutes=time_window_minutes)
                 
                 window_txs = [tx for tx in txs[i:] if tx['timestamp'] <= window_end]
@@ -0,0 +1,173 @@
+from collections import namedtuple
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import text
+
+from database.archive import TieredTransactions, default_archive
+
+FORWARD = "forward"
+BACKWARD = "backward"
+
+# One LATERAL lookup per frontier address, each served by the sender or recipient
+# index, so a hop costs at most len(frontier) * max_fanout index reads.
+_HOP_QUERIES = {
+    FORWARD: text("""
+        SELECT f.addr AS origin, t.tx_hash, t.sender AS from_addr, t.recipient AS to_addr, t.amount, t.timestamp
+        FROM unnest(CAST(:addrs AS text[]), CAST(:bounds AS timestamp[])) AS f(addr, bound)
+        CROSS JOIN LATERAL (
+            SELECT tx_hash, sender, details->>'recipient' AS recipient, amount, timestamp
+            FROM transactions
+            WHERE tx_type = 'Transfer'
+              AND sender = f.addr
+              AND timestamp >= f.bound
+              AND timestamp <= :window_end
+              AND amount >= :min_amount
+            ORDER BY amount DESC
+            LIMIT :max_fanout
+        ) t
+    """),
+    BACKWARD: text("""
+        SELECT f.addr AS origin, t.tx_hash, t.sender AS from_addr, t.recipient AS to_addr, t.amount, t.timestamp
+        FROM unnest(CAST(:addrs AS text[]), CAST(:bounds AS timestamp[])) AS f(addr, bound)
+        CROSS JOIN LATERAL (
+            SELECT tx_hash, sender, details->>'recipient' AS recipient, amount, timestamp
+            FROM transactions
+            WHERE tx_type = 'Transfer'
+              AND details->>'recipient' = f.addr
+              AND timestamp <= f.bound
+              AND timestamp >= :window_start
+              AND amount >= :min_amount
+            ORDER BY amount DESC
+            LIMIT :max_fanout
+        ) t
+    """),
+}
+
+
+HopRow = namedtuple('HopRow', ['origin', 'tx_hash', 'from_addr', 'to_addr', 'amount', 'timestamp'])
+
+
+class FundsTracer:
+    """
+    Multi-hop "follow the money" traversal over Transfer edges.
+
+    Forward traces only follow transfers made after the funds arrived at an address;
+    backward traces only follow transfers that landed before the funds left it.
+    Each edge carries a traced_amount: an upper bound on how much of the original
+    flow it can have carried (the edge amount capped by what reached its sender).
+
+    Hops are looked up in the hot table through its edge indexes. When the time
+    window reaches below the hot tier, each hop is also looked up in the Parquet
+    archive (forward hops filter on sender inside the scan; backward hops have to
+    read the recipient out of the archived details, so they cost a full scan).
+    """
+
+    def __init__(self, engine, archive=None):
+        self.engine = engine
+        self.tiers = TieredTransactions(engine, archive or default_archive(engine))
+
+    def trace(self, address, direction=FORWARD, max_depth=3, start=None, end=None,
+              max_fanout=25, min_amount=0, max_addresses=1000):
+        """
+        Generator yielding one dict per hop: {'depth', 'edges', 'frontier'}.
+        Stops early when no new addresses are reached or max_addresses is hit.
+        """
+        if direction not in _HOP_QUERIES:
+            raise ValueError(f"direction must be '{FORWARD}' or '{BACKWARD}'")
+
+        window_start = start or datetime.min
+        window_end = end or datetime.max
+
+        hot_floor = self.tiers.hot_floor_timestamp()
+        use_archive = bool(self.tiers.archive.archived_buckets()) and (hot_floor is None or window_start < hot_floor)
+
+        # address -> (time bound for the next hop, amount available to trace)
+        frontier = {address: (window_start if direction == FORWARD else window_end, float("inf"))}
+        visited = {address}
+
+        for depth in range(1, max_depth + 1):
+            if not frontier:
+                break
+
+            rows = self._fetch_hop(direction, frontier, window_start, window_end, max_fanout, min_amount)
+            if use_archive:
+                rows = self._merge_archived(
+                    rows, direction, frontier, window_start, window_end, max_fanout, min_amount
+                )
+
+            edges = []
+            next_frontier = {}
+            for row in rows:
+                bound, available = frontier[row.origin]
+                traced = min(float(row.amount or 0), available)
+                edge = {
+                    "depth": depth,
+                    "from": row.from_addr,
+                    "to": row.to_addr,
+                    "amount": row.amount,
+                    "traced_amount": traced,
+                    "timestamp": row.timestamp,
+                    "tx_hash": row.tx_hash,
+                }
+                edges.append(edge)
+
+                reached = row.to_addr if direction == FORWARD else row.from_addr
+                if not reached or reached in visited:
+                    continue
+                if reached in next_frontier:
+                    prev_bound, prev_available = next_frontier[reached]
+                    bound = min(prev_bound, row.timestamp) if direction == FORWARD else max(prev_bound, row.timestamp)
+                    next_frontier[reached] = (bound, prev_available + traced)
+                elif len(visited) + len(next_frontier) < max_addresses:
+                    next_frontier[reached] = (row.timestamp, traced)
+
+            visited.update(next_frontier)
+            frontier = next_frontier
+
+            yield {"depth": depth, "edges": edges, "frontier": list(frontier)}
+
+    def trace_all(self, address, **kwargs):
+        """Convenience wrapper that collects every hop into a flat list of edges"""
+        return [edge for hop in self.trace(address, **kwargs) for edge in hop["edges"]]
+
+    def _fetch_hop(self, direction, frontier, window_start, window_end, max_fanout, min_amount):
+        params = {
+            "addrs": list(frontier),
+            "bounds": [bound for bound, _ in frontier.values()],
+            "window_start": window_start,
+            "window_end": window_end,
+            "max_fanout": max_fanout,
+            "min_amount": min_amount,
+        }
+        with self.engine.connect() as conn:
+            return conn.execute(_HOP_QUERIES[direction], params).fetchall()
+
+    def _merge_archived(self, rows, direction, frontier, window_start, window_end, max_fanout, min_amount):
+        """Add archived transfers to a hop and keep the max_fanout largest per origin across both tiers"""
+        filters = [('tx_type', '==', 'Transfer'), ('amount', '>=', min_amount)]
+        if direction == FORWARD:
+            filters.append(('sender', 'in', list(frontier)))
+        cold = self.tiers.archive.read(columns=['tx_hash', 'sender', 'amount', 'timestamp', 'details'], filters=filters)
+
+        by_origin = {}
+        for row in rows:
+            by_origin.setdefault(row.origin, {})[row.tx_hash] = row
+        for rec in cold.itertuples(index=False):
+            recipient = rec.details.get('recipient') if isinstance(rec.details, dict) else None
+            origin = rec.sender if direction == FORWARD else recipient
+            if origin not in frontier or pd.isna(rec.timestamp) or not window_start <= rec.timestamp <= window_end:
+                continue
+            bound, _ = frontier[origin]
+            if (rec.timestamp < bound) if direction == FORWARD else (rec.timestamp > bound):
+                continue
+            amount = rec.amount.item() if hasattr(rec.amount, 'item') else rec.amount
+            # A tx_hash already returned by the hot table is the fresher copy
+            by_origin.setdefault(origin, {}).setdefault(
+                rec.tx_hash, HopRow(origin, rec.tx_hash, rec.sender, recipient, amount, rec.timestamp.to_pydatetime())
+            )
+
+        merged = []
+        for found in by_origin.values():
+            merged.extend(sorted(found.values(), key=lambda r: r.amount or 0, reverse=True)[:max_fanout])
+        return merged
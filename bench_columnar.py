@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from analytics.columnar import ColumnarStore, DEFAULT_COLUMNAR_PATH
+
+# Compares the current path (SQLAlchemy -> PostgreSQL -> pandas) with the embedded
+# DuckDB store for the aggregates behind the dashboard, wallet profiling and detector loading.
+
+load_dotenv()
+DB_URL = os.getenv("DATABASE_URL")
+REPEAT = int(os.getenv("BENCH_REPEAT", "3"))
+
+
+def timed(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def pandas_daily_volume(engine):
+    df = pd.read_sql("SELECT amount, timestamp FROM transactions", engine)
+    dates = pd.to_datetime(df['timestamp']).dt.date.rename('date')
+    return df.groupby(dates)['amount'].sum().reset_index()
+
+
+def pandas_tx_type_counts(engine):
+    df = pd.read_sql("SELECT tx_type FROM transactions", engine)
+    return df['tx_type'].fillna('Unknown').value_counts().reset_index()
+
+
+def pandas_address_stats(engine):
+    df = pd.read_sql("SELECT sender, amount, timestamp FROM transactions", engine)
+    stats = df.groupby('sender').agg(
+        tx_count=('amount', 'size'),
+        total_volume=('amount', 'sum'),
+        avg_amount=('amount', 'mean'),
+        first_seen=('timestamp', 'min'),
+        last_seen=('timestamp', 'max'),
+    )
+    return stats.sort_values('total_volume', ascending=False).head(100)
+
+
+def pandas_transfer_edges(engine):
+    df = pd.read_sql("SELECT sender, details, amount, timestamp FROM transactions WHERE tx_type = 'Transfer' ORDER BY timestamp", engine)
+    df['recipient'] = df['details'].apply(lambda d: d.get('recipient') if isinstance(d, dict) else None)
+    return df.dropna(subset=['recipient'])
+
+
+def main():
+    if not DB_URL:
+        print("DATABASE_URL not found in .env")
+        sys.exit(1)
+
+    engine = create_engine(DB_URL)
+    store = ColumnarStore(engine, path=os.getenv("COLUMNAR_DB_PATH", DEFAULT_COLUMNAR_PATH))
+
+    start = time.perf_counter()
+    copied = store.sync_from_postgres()
+    print(f"Synced {copied} new rows into {store.path} in {time.perf_counter() - start:.2f}s")
+
+    cases = [
+        ("daily volume", lambda: pandas_daily_volume(engine), store.daily_volume),
+        ("tx type counts", lambda: pandas_tx_type_counts(engine), store.tx_type_counts),
+        ("address stats", lambda: pandas_address_stats(engine), store.address_stats),
+        ("transfer edges", lambda: pandas_transfer_edges(engine), store.transfer_edges),
+    ]
+
+    print(f"{'query':<16}{'pandas (s)':>12}{'duckdb (s)':>12}{'speedup':>10}")
+    print("-" * 50)
+    for name, pandas_fn, duck_fn in cases:
+        pandas_s = timed(pandas_fn)
+        duck_s = timed(duck_fn)
+        print(f"{name:<16}{pandas_s:>12.3f}{duck_s:>12.3f}{pandas_s / max(duck_s, 1e-9):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+
+# Cold start budget per entry point, in seconds, measured in a fresh interpreter.
+# Each entry point must also leave the listed heavy modules unimported.
+HEAVY_AI = ["langchain", "langchain_community", "langchain_openai", "openai"]
+HEAVY_GRAPH = ["networkx", "pyvis"]
+
+TARGETS = [
+    {
+        "name": "dashboard first render",
+        "setup": "from streamlit.testing.v1 import AppTest",
+        "code": "AppTest.from_file('dashboard/app.py', default_timeout=60).run()",
+        "budget": 4.0,
+        "forbidden": HEAVY_AI + HEAVY_GRAPH,
+    },
+    {
+        "name": "indexer import",
+        "setup": "",
+        "code": "import indexer.babylon_fetcher",
+        "budget": 1.5,
+        "forbidden": HEAVY_AI + HEAVY_GRAPH,
+    },
+    {
+        "name": "batch scan import",
+        "setup": "",
+        "code": "import analytics.batch_scan",
+        "budget": 2.0,
+        "forbidden": HEAVY_AI,
+    },
+    {
+        "name": "ai agent import",
+        "setup": "",
+        "code": "import ai_agent.backend",
+        "budget": 1.5,
+        "forbidden": HEAVY_AI,
+    },
+]
+
+PROBE = """
+import json, sys, time
+{setup}
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(target):
+    env = dict(os.environ)
+    # The dashboard only needs a URL to build its engine; the feed thread tolerates failures.
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    probe = PROBE.format(setup=target["setup"], code=target["code"], forbidden=target["forbidden"])
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    scale = float(os.environ.get("COLD_START_BUDGET_SCALE", "1.0"))
+    failures = 0
+
+    print("Measuring cold start...")
+    for target in TARGETS:
+        budget = target["budget"] * scale
+        print(f"👉 {target['name']} ... ", end="")
+        try:
+            stats = measure(target)
+        except Exception as e:
+            print(f"ERROR ({e})")
+            failures += 1
+            continue
+
+        problems = []
+        if stats["seconds"] > budget:
+            problems.append(f"{stats['seconds']:.2f}s > {budget:.2f}s budget")
+        if stats["loaded"]:
+            problems.append(f"eagerly imported {', '.join(stats['loaded'])}")
+
+        if problems:
+            print(f"FAILED ({'; '.join(problems)})")
+            failures += 1
+        else:
+            print(f"OK ({stats['seconds']:.2f}s / {budget:.2f}s)")
+
+    print("-" * 30)
+    if failures:
+        print(f"{failures} cold start check(s) regressed.")
+        sys.exit(1)
+    print("Cold start within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,12 @@ from dotenv import load_dotenv
 from PIL import Image
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from ai_agent.backend import AnalyticsAgent 
-from analytics.graph_algo import SuspiciousBehaviorDetector 
-from analytics.visuals import generate_cluster_map 
+# Heavy subsystems (langchain/openai for the AI agent, networkx/pyvis for the
+# cluster map) are imported inside the pages that use them so cold start only
+# pays for what the first page renders.
+from dashboard.live_feed import TransactionFeed
+from database.archive import DEFAULT_ARCHIVE_DIR
+from database.schema import ensure_indexes
 
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
@@ -37,7 +40,13 @@ st.markdown("""
 @st.cache_resource
 def get_db_connection():
     db_url = os.getenv("DATABASE_URL")
-    return create_engine(db_url)
+    engine = create_engine(db_url)
+    try:
+        # Edge indexes the Follow the Money trace relies on; a no-op once they exist
+        ensure_indexes(engine)
+    except Exception as e:
+        print(f"Could not create transaction indexes: {e}")
+    return engine
 
 try:
     engine = get_db_connection()
@@ -45,18 +54,26 @@ except:
     st.error("Database Connection Failed")
     st.stop()
 
-@st.cache_data(ttl=60)
-def load_data():
-    try:
-        query = "SELECT * FROM transactions ORDER BY timestamp DESC LIMIT 2000"
-        df = pd.read_sql(query, engine)
-        if 'amount' in df.columns:
-            df['Risk Label'] = df['amount'].apply(lambda x: "🐋 Whale" if x > 4000 else ("🦐 Shrimp" if x < 10 else "👤 User"))
-        if 'tx_type' not in df.columns: df['tx_type'] = 'Unknown'
-        else: df['tx_type'] = df['tx_type'].fillna('Unknown')
-        return df
-    except:
-        return pd.DataFrame(columns=['sender', 'amount', 'timestamp', 'tx_hash', 'tx_type', 'details', 'Risk Label'])
+@st.cache_resource
+def get_transaction_feed():
+    return TransactionFeed(engine).start()
+
+feed = get_transaction_feed()
+
+@st.cache_resource
+def get_columnar():
+    from analytics.columnar import get_columnar_store
+
+    store = get_columnar_store(engine)
+    if store is None:
+        return None
+    # Archived history only lives in Parquet, so "all history" needs it loaded too
+    store.sync_from_archive(archive_dir)
+    return store.start_background_sync()
+
+archive_dir = os.getenv("ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR)
+
+columnar = get_columnar()
 
 with st.sidebar:
     try:
@@ -73,7 +90,9 @@ with st.sidebar:
         try:
             from seed_crime_data import run_seed 
             run_seed()
-            st.cache_data.clear()
+            feed.reset()
+            if columnar:
+                columnar.rebuild(archive_dir)
             st.success("Reset Done!")
             st.rerun()
         except Exception as e:
@@ -105,7 +124,7 @@ with header_ph:
     st.divider()
 
 
-df = load_data()
+df = feed.snapshot()
 
 with content_ph.container():
     
@@ -113,15 +132,27 @@ with content_ph.container():
     if page == "Network Overview":
         st.header("Network Overview")
         if df.empty:
-            st.warning("Database empty.")
+            st.warning("Database empty." if feed.ready else "Loading live feed...")
         else:
+            # Metrics and chart come from the same dataset: full history from the
+            # columnar store when it is enabled, otherwise the live feed buffer.
+            if columnar:
+                summary = columnar.summary()
+                n_txs, volume, whales = summary['transactions'], summary['volume'], summary['whales']
+                daily_vol = columnar.daily_volume()
+                st.caption("All indexed history (columnar engine)")
+            else:
+                n_txs, volume = len(df), df['amount'].sum()
+                whales = len(df[df['Risk Label'] == "🐋 Whale"])
+                dates = pd.to_datetime(df['timestamp']).dt.date.rename('date')
+                daily_vol = df.groupby(dates)['amount'].sum().reset_index()
+                st.caption(f"Latest {len(df)} transactions")
+
             m1, m2, m3 = st.columns(3)
-            m1.metric("Transactions", len(df))
-            m2.metric("Volume", f"{df['amount'].sum():,} BBN")
-            m3.metric("Whales", len(df[df['Risk Label'] == "🐋 Whale"]))
+            m1.metric("Transactions", n_txs)
+            m2.metric("Volume", f"{volume:,.2f} BBN")
+            m3.metric("Whales", whales)
             
-            df['date'] = pd.to_datetime(df['timestamp']).dt.date
-            daily_vol = df.groupby('date')['amount'].sum().reset_index()
             fig = px.bar(daily_vol, x='date', y='amount', title="Daily Volume", color_discrete_sequence=['#FF4B4B'])
             st.plotly_chart(fig, use_container_width=True)
 
@@ -138,6 +169,8 @@ with content_ph.container():
             target = st.selectbox("Select Suspect:", senders)
             
             if target:
+                from analytics.visuals import generate_cluster_map
+
                 c1, c2 = st.columns([3, 1])
                 with c1:
                     html = generate_cluster_map(df.head(1000), target)
@@ -147,25 +180,53 @@ with content_ph.container():
                     if st.button("AI Deep Analysis"):
                         if api_key:
                             with st.spinner("Analyzing..."):
+                                from ai_agent.backend import AnalyticsAgent
                                 agent = AnalyticsAgent(api_key=api_key)
                                 st.info(agent.analyze_wallet_deep_dive(target))
                         else:
                             st.error("No API Key")
 
+                st.subheader("Follow the Money")
+                t1, t2, t3 = st.columns(3)
+                direction = t1.radio("Direction", ["forward", "backward"], horizontal=True)
+                depth = t2.slider("Hops", 1, 6, 3)
+                fanout = t3.slider("Max fan-out per hop", 5, 100, 25)
+                if st.button("Trace Funds"):
+                    from analytics.trace import FundsTracer
+
+                    status = st.empty()
+                    trace_table = st.empty()
+                    traced = []
+                    try:
+                        for hop in FundsTracer(engine).trace(target, direction=direction, max_depth=depth, max_fanout=fanout):
+                            traced.extend(hop['edges'])
+                            status.caption(f"Hop {hop['depth']}: {len(hop['edges'])} transfers, {len(hop['frontier'])} new addresses")
+                            trace_table.dataframe(pd.DataFrame(traced), use_container_width=True)
+                        if not traced:
+                            status.info("No transfers found from this address.")
+                    except Exception as e:
+                        st.error(f"Trace Error: {e}")
+
     # 3. PROTOCOL ACTIVITY
     elif page == "Protocol Activity":
         st.header("Protocol Activity")
         if not df.empty and 'tx_type' in df.columns:
-            counts = df['tx_type'].value_counts().reset_index()
-            counts.columns = ['Type', 'Count']
+            if columnar:
+                counts = columnar.tx_type_counts()
+                st.caption("All indexed history (columnar engine)")
+            else:
+                counts = df['tx_type'].value_counts().reset_index()
+                counts.columns = ['Type', 'Count']
+                st.caption(f"Latest {len(df)} transactions")
+            type_totals = dict(zip(counts['Type'], counts['Count']))
             
             c1, c2 = st.columns(2)
             with c1:
                 fig = px.pie(counts, values='Count', names='Type', title="Types", hole=0.4, color_discrete_sequence=px.colors.sequential.RdBu)
                 st.plotly_chart(fig, use_container_width=True)
             with c2:
-                st.metric("BTC Delegations", len(df[df['tx_type'] == "BTC_Stake"]))
-                st.metric("Governance Votes", len(df[df['tx_type'] == "Governance_Vote"]))
+                st.metric("BTC Delegations", int(type_totals.get("BTC_Stake", 0)))
+                st.metric("Governance Votes", int(type_totals.get("Governance_Vote", 0)))
             
             st.divider()
             st.subheader("Event Log")
@@ -180,8 +241,9 @@ with content_ph.container():
         if q:
             st.chat_message("user").write(q)
             if api_key:
-                agent = AnalyticsAgent(api_key=api_key)
                 with st.spinner("Thinking..."):
+                    from ai_agent.backend import AnalyticsAgent
+                    agent = AnalyticsAgent(api_key=api_key)
                     response = agent.ask(q)
                     st.chat_message("assistant").write(response)
             else:
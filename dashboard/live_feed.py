@@ -0,0 +1,128 @@
+import threading
+
+import pandas as pd
+from sqlalchemy import text
+
+from database.schema import UBBN_PER_BBN
+
+FEED_COLUMNS = ['id', 'sender', 'amount', 'timestamp', 'tx_hash', 'tx_type', 'details', 'Risk Label']
+
+
+def risk_label(amount):
+    """Label for an amount in BBN"""
+    return "🐋 Whale" if amount > 4000 else ("🦐 Shrimp" if amount < 10 else "👤 User")
+
+
+class TransactionFeed:
+    """
+    Process-wide ring buffer of the most recent transactions.
+
+    A single daemon thread polls for rows with an id above the last one seen and
+    merges only that delta, so DB load is one small query per interval no matter
+    how many sessions are open. Readers get the latest published snapshot and never
+    wait on the database.
+
+    The id is only the watermark for finding new rows. Writers insert newest-first
+    (a backward scan from the tip, the seeder), so which rows are kept and how they
+    are ordered is decided by (timestamp, id), newest first.
+
+    With several writers, ids can commit out of order, so each poll also re-checks the
+    trailing late_window ids below the watermark for rows it has not seen yet.
+    """
+
+    def __init__(self, engine, capacity=2000, poll_interval=5.0, late_window=500):
+        self.engine = engine
+        self.capacity = capacity
+        self.poll_interval = poll_interval
+        self.late_window = late_window
+        self.last_id = 0
+        self._seen_ids = set()  # ids above the trailing window already fetched
+        self.generation = 0
+        self.ready = False
+        self._snapshot = pd.DataFrame(columns=FEED_COLUMNS)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="transaction-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def reset(self):
+        """Drop the buffer so the next poll reloads from scratch (e.g. after a reseed)"""
+        with self._lock:
+            self.last_id = 0
+            self._seen_ids = set()
+            self.generation += 1
+            self.ready = False
+            self._snapshot = pd.DataFrame(columns=FEED_COLUMNS)
+
+    def snapshot(self):
+        """
+        Latest transactions, newest first. The shared frame is never mutated after it
+        is published; callers get a shallow copy so adding columns stays per-session.
+        """
+        return self._snapshot.copy(deep=False)
+
+    def poll_once(self):
+        with self._lock:
+            generation = self.generation
+            floor = max(self.last_id - self.late_window, 0)
+            known = sorted(i for i in self._seen_ids if i > floor)
+
+        # Of the unseen rows up to the current high id, only the newest `capacity` by
+        # time can make it into the buffer, so that is all that is fetched
+        query = text(
+            "SELECT * FROM transactions WHERE id > :floor AND id <= :high "
+            "AND NOT (id = ANY(CAST(:known AS bigint[]))) "
+            "ORDER BY timestamp DESC NULLS LAST, id DESC LIMIT :limit"
+        )
+        with self.engine.connect() as conn:
+            high = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM transactions")).scalar()
+            delta = pd.read_sql(
+                query, conn, params={"floor": floor, "high": high, "known": known, "limit": self.capacity}
+            )
+
+        if delta.empty:
+            with self._lock:
+                if generation == self.generation:
+                    self.last_id = max(self.last_id, high)
+                    self.ready = True
+            return 0
+
+        if 'amount' in delta.columns:
+            # The table stores ubbn; everything the dashboard shows is in BBN
+            delta['amount'] = delta['amount'] / UBBN_PER_BBN
+            delta['Risk Label'] = delta['amount'].apply(risk_label)
+        if 'tx_type' not in delta.columns: delta['tx_type'] = 'Unknown'
+        else: delta['tx_type'] = delta['tx_type'].fillna('Unknown')
+
+        with self._lock:
+            if generation != self.generation:
+                # reset() ran while we were querying; this delta belongs to the old data
+                return 0
+            current = self._snapshot
+            merged = delta if current.empty else pd.concat([delta, current], ignore_index=True)
+            # New ids are not necessarily newer blocks, so the buffer is ranked by time
+            merged = merged.sort_values(['timestamp', 'id'], ascending=False, na_position='last')
+            self._snapshot = merged.head(self.capacity).reset_index(drop=True)
+            self.last_id = max(self.last_id, high)
+            floor = max(self.last_id - self.late_window, 0)
+            self._seen_ids = {i for i in self._seen_ids if i > floor}
+            self._seen_ids.update(int(i) for i in delta['id'] if i > floor)
+            self.ready = True
+        return len(delta)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"Feed poll failed: {e}")
+            self._stop.wait(self.poll_interval)
@@ -0,0 +1,221 @@
+import json
+import os
+
+import click
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+DEFAULT_ARCHIVE_DIR = "archive/transactions"
+TX_COLUMNS = ['id', 'tx_hash', 'height', 'sender', 'amount', 'timestamp', 'tx_type', 'details']
+
+
+def default_archive(engine):
+    """The archive readers should use: ARCHIVE_DIR if set, else the default location"""
+    return TransactionArchive(engine, root=os.getenv("ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR))
+
+
+class TransactionArchive:
+    """
+    Cold tier for the transactions table.
+
+    Blocks older than the hot window are compacted into zstd-compressed Parquet
+    files, one per fixed height range (hive-partitioned as height_bucket=<start>),
+    and then deleted from PostgreSQL. Analytical jobs can point pyarrow, pandas or
+    DuckDB straight at the archive directory.
+    """
+
+    def __init__(self, engine, root=DEFAULT_ARCHIVE_DIR, bucket_size=10_000):
+        self.engine = engine
+        self.root = root
+        self.bucket_size = bucket_size
+
+    def bucket_of(self, height):
+        return (height // self.bucket_size) * self.bucket_size
+
+    def bucket_path(self, bucket):
+        return os.path.join(self.root, f"height_bucket={bucket}", "data.parquet")
+
+    def archived_buckets(self):
+        if not os.path.isdir(self.root):
+            return []
+        buckets = [
+            int(name.split("=", 1)[1]) for name in os.listdir(self.root)
+            if name.startswith("height_bucket=")
+        ]
+        return sorted(b for b in buckets if os.path.exists(self.bucket_path(b)))
+
+    def ceiling(self):
+        """First height above every archived bucket, or None when nothing is archived"""
+        buckets = self.archived_buckets()
+        return buckets[-1] + self.bucket_size if buckets else None
+
+    # --- Compaction ---
+
+    def compact(self, keep_blocks=100_000):
+        """Move every complete height bucket below (tip - keep_blocks) from the hot table into the archive"""
+        with self.engine.connect() as conn:
+            bounds = conn.execute(text("SELECT MIN(height), MAX(height) FROM transactions")).first()
+        if not bounds or bounds[0] is None:
+            print("Hot table empty, nothing to compact.")
+            return 0
+
+        min_height, max_height = bounds
+        cutoff = max_height - keep_blocks
+        moved = 0
+
+        bucket = self.bucket_of(min_height)
+        while bucket + self.bucket_size <= cutoff:
+            moved += self.compact_bucket(bucket)
+            bucket += self.bucket_size
+
+        print(f"Compacted {moved} transactions below height {cutoff}.")
+        return moved
+
+    def compact_bucket(self, bucket):
+        lo, hi = bucket, bucket + self.bucket_size
+        with self.engine.begin() as conn:
+            hot = pd.read_sql(
+                text("SELECT * FROM transactions WHERE height >= :lo AND height < :hi ORDER BY height, id"),
+                conn, params={"lo": lo, "hi": hi},
+            )
+            if hot.empty:
+                return 0
+
+            path = self.bucket_path(bucket)
+            frame = self._to_archive_frame(hot)
+            if os.path.exists(path):
+                # Late backfill into an already archived range: merge, keeping the newest copy
+                frame = pd.concat([pd.read_parquet(path), frame], ignore_index=True)
+                frame = frame.drop_duplicates(subset='tx_hash', keep='last')
+
+            self._write_atomic(frame, path)
+            # Only delete once the file is durable; a crash before commit just re-archives the bucket.
+            # Delete exactly the rows that were written: anything committed into this range since
+            # the SELECT stays hot and is picked up by the next compaction.
+            conn.execute(
+                text("DELETE FROM transactions WHERE id = ANY(:ids)"),
+                {"ids": [int(i) for i in hot['id']]},
+            )
+
+        print(f"   Archived heights {lo}-{hi - 1}: {len(hot)} rows")
+        return len(hot)
+
+    def _to_archive_frame(self, df):
+        df = df.reindex(columns=TX_COLUMNS).copy()
+        df['details'] = df['details'].apply(lambda d: d if d is None or isinstance(d, str) else json.dumps(d))
+        return df
+
+    def _write_atomic(self, frame, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        frame.sort_values(['height', 'id']).to_parquet(tmp, index=False, compression="zstd")
+        os.replace(tmp, path)
+
+    # --- Reads ---
+
+    def read(self, min_height=None, max_height=None, columns=None, sender=None, filters=None):
+        """
+        Read archived rows in [min_height, max_height], touching only the overlapping buckets.
+        filters are extra pyarrow (column, op, value) predicates, pushed down into the scan.
+        """
+        paths = [
+            self.bucket_path(b) for b in self.archived_buckets()
+            if (min_height is None or b + self.bucket_size > min_height)
+            and (max_height is None or b <= max_height)
+        ]
+        if not paths:
+            return pd.DataFrame(columns=columns or TX_COLUMNS)
+
+        filters = list(filters or [])
+        if sender is not None:
+            filters.append(('sender', '==', sender))
+        filters = filters or None
+        df = pd.concat([pd.read_parquet(p, columns=columns, filters=filters) for p in paths], ignore_index=True)
+        if min_height is not None:
+            df = df[df['height'] >= min_height]
+        if max_height is not None:
+            df = df[df['height'] <= max_height]
+        if 'details' in df.columns:
+            df['details'] = df['details'].apply(lambda d: json.loads(d) if isinstance(d, str) and d.startswith(('{', '[')) else d)
+        return df.reset_index(drop=True)
+
+
+class TieredTransactions:
+    """Query layer that reads transactions transparently across the hot table and the archive"""
+
+    def __init__(self, engine, archive=None):
+        self.engine = engine
+        self.archive = archive or TransactionArchive(engine)
+
+    def hot_floor_timestamp(self):
+        """
+        Earliest block time that is complete in the hot table, or None when nothing is
+        archived (everything is hot). Anything older may only exist in the archive.
+        """
+        ceiling = self.archive.ceiling()
+        if ceiling is None:
+            return None
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT MIN(timestamp) FROM transactions WHERE height >= :ceiling"), {"ceiling": ceiling}
+            ).scalar()
+
+    def read(self, min_height=None, max_height=None, columns=None, sender=None):
+        columns = columns or TX_COLUMNS
+        if 'height' not in columns:
+            columns = columns + ['height']
+        # A row can sit in both tiers (a crash between the Parquet write and the delete,
+        # or a replay into an archived height), so tx_hash is always read to merge on
+        drop_hash = 'tx_hash' not in columns
+        if drop_hash:
+            columns = columns + ['tx_hash']
+
+        clauses, params = [], {}
+        if sender is not None:
+            clauses.append("sender = :sender")
+            params["sender"] = sender
+        if min_height is not None:
+            clauses.append("height >= :min_height")
+            params["min_height"] = min_height
+        if max_height is not None:
+            clauses.append("height <= :max_height")
+            params["max_height"] = max_height
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = text(f"SELECT {', '.join(columns)} FROM transactions {where} ORDER BY height")
+
+        with self.engine.connect() as conn:
+            hot = pd.read_sql(query, conn, params=params)
+
+        # Skip the archive entirely when the requested range starts above every archived bucket
+        ceiling = self.archive.ceiling()
+        if ceiling is None or (min_height is not None and min_height >= ceiling):
+            merged = hot
+        else:
+            cold = self.archive.read(min_height, max_height, columns=columns, sender=sender)
+            merged = hot if cold.empty else pd.concat([cold, hot], ignore_index=True)
+            merged = merged.drop_duplicates(subset='tx_hash', keep='last')
+            merged = merged.sort_values('height').reset_index(drop=True)
+        return merged.drop(columns='tx_hash') if drop_hash else merged
+
+
+@click.group()
+def cli():
+    """Hot/cold tiering for the transactions table."""
+
+
+@cli.command()
+@click.option("--keep-blocks", default=100_000, show_default=True, help="Blocks below the tip that stay in PostgreSQL.")
+@click.option("--bucket-size", default=10_000, show_default=True, help="Heights per archive file.")
+@click.option("--archive-dir", default=DEFAULT_ARCHIVE_DIR, show_default=True, envvar="ARCHIVE_DIR")
+def compact(keep_blocks, bucket_size, archive_dir):
+    """Move old height ranges from the hot table into Parquet archive files."""
+    load_dotenv()
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise click.ClickException("DATABASE_URL not found in .env")
+    TransactionArchive(create_engine(db_url), root=archive_dir, bucket_size=bucket_size).compact(keep_blocks)
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,8 +1,12 @@
-from sqlalchemy import create_engine, Column, String, Integer, BigInteger, DateTime, Boolean, JSON
+from sqlalchemy import text, create_engine, Column, String, Integer, BigInteger, DateTime, Boolean, JSON, Float, Index, UniqueConstraint
 from sqlalchemy.orm import declarative_base  
+from sqlalchemy.schema import CreateIndex
 
 Base = declarative_base()
 
+# transactions.amount holds base units (ubbn)
+UBBN_PER_BBN = 1_000_000
+
 class Transaction(Base):
     __tablename__ = 'transactions'
     
@@ -15,6 +19,13 @@ class Transaction(Base):
     tx_type = Column(String) 
     details = Column(JSON)    
 
+    __table_args__ = (
+        Index('ix_transactions_timestamp_id', 'timestamp', 'id'),
+        # Edge lookups for multi-hop tracing (analytics/trace.py)
+        Index('ix_transactions_sender_timestamp', 'sender', 'timestamp'),
+        Index('ix_transactions_recipient_timestamp', text("(details->>'recipient')"), 'timestamp'),
+    )
+
 class AddressLabel(Base):
     __tablename__ = 'address_labels'
     
@@ -22,6 +33,51 @@ class AddressLabel(Base):
     label = Column(String)
     category = Column(String)
 
+class ScanCheckpoint(Base):
+    __tablename__ = 'scan_checkpoints'
+
+    scan_name = Column(String, primary_key=True)
+    last_id = Column(Integer)
+    last_timestamp = Column(DateTime)
+    updated_at = Column(DateTime)
+
+class DetectorFinding(Base):
+    __tablename__ = 'detector_findings'
+
+    id = Column(Integer, primary_key=True)
+    scan_name = Column(String)
+    detector = Column(String)
+    finding_key = Column(String)
+    address = Column(String)
+    score = Column(Float)
+    details = Column(JSON)
+    detected_at = Column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint('scan_name', 'detector', 'finding_key', name='uq_detector_findings_key'),
+    )
+
+def ensure_indexes(engine):
+    """
+    CREATE INDEX IF NOT EXISTS for every transactions index. create_all only adds
+    indexes when it creates the table, so existing deployments need this.
+    """
+    with engine.begin() as conn:
+        for index in Transaction.__table__.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
 def init_db(db_url):
     engine = create_engine(db_url)
-    Base.metadata.create_all(engine)
\ No newline at end of file
+    Base.metadata.create_all(engine)
+    ensure_indexes(engine)
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise ValueError("DATABASE_URL not found in .env")
+    init_db(db_url)
+    print("Schema and indexes are up to date.")
\ No newline at end of file
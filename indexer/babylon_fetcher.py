@@ -1,22 +1,34 @@
 import sys
 import asyncio
+import click
 import httpx
 import json
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 
 sys.path.append('.')
 
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import insert
 from database.schema import Base, Transaction
+from indexer.raw_archive import RawBlockArchive
 from dotenv import load_dotenv
 import os
 
-load_dotenv()
+SUBSCRIBE_NEW_BLOCK = {
+    "jsonrpc": "2.0",
+    "method": "subscribe",
+    "id": 1,
+    "params": {"query": "tm.event='NewBlock'"}
+}
 
 class BabylonIndexer:
-    def __init__(self):
-        self.NODES = [
+    # Page size for /cosmos/tx/v1beta1/txs; the SDK caps a page at 100 txs
+    TXS_PAGE_LIMIT = 100
+
+    def __init__(self, nodes=None, ws_url=None, raw_archive=None):
+        self.NODES = nodes or [
             "https://babylon-archive.nodes.guru/api",
             "https://babylon-api.polkachu.com",
             "https://babylon.api.kjnodes.com",
@@ -26,12 +38,18 @@ class BabylonIndexer:
         self.current_node_index = 0
         self.BASE_URL = self.NODES[0]
         
+        load_dotenv()
+        self.WS_URL = ws_url or os.getenv("BABYLON_WS_URL", "wss://babylon-rpc.polkachu.com/websocket")
         db_url = os.getenv("DATABASE_URL")
         if not db_url:
             raise ValueError("DATABASE_URL not found in .env")
             
         self.engine = create_engine(db_url)
         self.Session = sessionmaker(bind=self.engine)
+        self.raw_archive = raw_archive
+        # Subscription mode: how hard to retry a block the REST side has not caught up on
+        self.ingest_attempts = 6
+        self.retry_delay = 1.0
 
     def switch_node(self):
         """Switch to the next node in the list if the current one fails"""
@@ -55,17 +73,58 @@ class BabylonIndexer:
             print("All nodes failed. Please check your internet connection.")
             return None
 
-    async def fetch_txs(self, height):
+    async def fetch_block_tx_count(self, height):
+        """Number of txs in block `height`, read from the block itself"""
         async with httpx.AsyncClient() as client:
             try:
-                resp = await client.get(f"{self.BASE_URL}/cosmos/tx/v1beta1/txs?events=tx.height={height}", timeout=10.0)
+                resp = await client.get(f"{self.BASE_URL}/cosmos/base/tendermint/v1beta1/blocks/{height}", timeout=10.0)
                 resp.raise_for_status()
-                return resp.json()
+                return len(resp.json()['block'].get('data', {}).get('txs') or [])
+            except Exception as e:
+                print(f"Error fetching block {height}: {e}")
+                return None
+
+    async def fetch_txs(self, height):
+        """
+        All txs of a block, following pagination: nodes answer at most `limit` txs
+        per page (100 by default), so busy blocks take several requests. The pages
+        are merged into a single response before it is archived or parsed.
+        """
+        data, page = None, 1
+        async with httpx.AsyncClient() as client:
+            try:
+                while True:
+                    resp = await client.get(
+                        f"{self.BASE_URL}/cosmos/tx/v1beta1/txs?events=tx.height={height}"
+                        f"&page={page}&limit={self.TXS_PAGE_LIMIT}",
+                        timeout=10.0,
+                    )
+                    resp.raise_for_status()
+                    chunk = resp.json()
+                    batch = chunk.get('tx_responses') or []
+                    if data is None:
+                        data = chunk
+                    else:
+                        data['txs'] = (data.get('txs') or []) + (chunk.get('txs') or [])
+                        data['tx_responses'] = (data.get('tx_responses') or []) + batch
+
+                    total = int(chunk.get('total') or 0)
+                    fetched = len(data.get('tx_responses') or [])
+                    if len(batch) < self.TXS_PAGE_LIMIT or (total and fetched >= total):
+                        break
+                    page += 1
+
+                data.pop('pagination', None)
+                data.pop('total', None)
+                if self.raw_archive is not None:
+                    self.raw_archive.put(height, data)
+                return data
             except Exception as e:
                 print(f"Error fetching txs for block {height}: {e}")
                 return None
 
-    def extract_sender(self, tx_body):
+    @staticmethod
+    def extract_sender(tx_body):
         """Helper to find the address depending on the message type"""
         try:
             messages = tx_body.get('body', {}).get('messages', [])
@@ -85,7 +144,8 @@ class BabylonIndexer:
         except Exception:
             return "unknown"
 
-    def parse_message(self, tx_body):
+    @staticmethod
+    def parse_message(tx_body):
         """
         Analyzes the transaction body to determine Type and Specific Details.
         Returns: (tx_type, details_dict)
@@ -138,6 +198,77 @@ class BabylonIndexer:
             print(f"Parser Error: {e}")
             return "Error", {}
 
+    @staticmethod
+    def parse_timestamp(timestamp_str):
+        """Block time from a tx response as naive UTC; falls back to now if missing or malformed"""
+        try:
+            ts = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+            return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+        except Exception:
+            return datetime.now()
+
+    @staticmethod
+    def build_rows(h, data):
+        """Decode a /cosmos/tx/v1beta1/txs response for block h into transaction row dicts"""
+        if not (data and 'tx_responses' in data and len(data['tx_responses']) > 0):
+            return []
+
+        responses = data.get('tx_responses', [])
+        tx_bodies = data.get('txs', [])
+        rows = []
+
+        for i, resp in enumerate(responses):
+            try:
+                tx_hash = resp.get('txhash')
+                timestamp_str = resp.get('timestamp', datetime.now().isoformat()) 
+                
+                
+                body = None
+                if i < len(tx_bodies):
+                    body = tx_bodies[i]
+
+                if body:
+                    tx_type, details = BabylonIndexer.parse_message(body)
+                    sender = BabylonIndexer.extract_sender(body)
+                else:
+                    tx_type, details = "Unknown", {}
+                    sender = "unknown"
+
+                rows.append(dict(
+                    tx_hash=tx_hash,
+                    height=h,
+                    sender=sender,
+                    amount=0,
+                    tx_type=tx_type, 
+                    details=details, 
+                    timestamp=BabylonIndexer.parse_timestamp(timestamp_str)
+                ))
+
+            except Exception as e:
+                print(f"   Parsing Error: {e}")
+                continue
+
+        return rows
+
+    def save_block(self, session, h, data):
+        """Parse a /cosmos/tx/v1beta1/txs response for block h and merge its transactions"""
+        rows = self.build_rows(h, data)
+        if not rows:
+            return 0
+
+        print(f"\n⚡ Found {len(rows)} Transactions in Block {h}")
+
+        for row in rows:
+            try:
+                session.merge(Transaction(**row)) 
+                session.commit()
+                print(f"   Saved: {row['tx_type']} | {row['tx_hash'][:10]}...")
+            except Exception as db_err:
+                session.rollback()
+                print(f"   DB Error: {db_err}")
+
+        return len(rows)
+
     async def run(self):
         latest_height = await self.fetch_latest_block()
         if not latest_height:
@@ -153,57 +284,212 @@ class BabylonIndexer:
             print(f"Processing Block {h}...", end="\r")
             
             data = await self.fetch_txs(h)
-            
-            if data and 'tx_responses' in data and len(data['tx_responses']) > 0:
-                responses = data.get('tx_responses', [])
-                tx_bodies = data.get('txs', [])
-                
-                print(f"\n⚡ Found {len(responses)} Transactions in Block {h}")
-
-                for i, resp in enumerate(responses):
-                    try:
-                        tx_hash = resp.get('txhash')
-                        timestamp_str = resp.get('timestamp', datetime.now().isoformat()) 
-                        
-                        
-                        body = None
-                        if i < len(tx_bodies):
-                            body = tx_bodies[i]
-
-                        if body:
-                            tx_type, details = self.parse_message(body)
-                            sender = self.extract_sender(body)
-                        else:
-                            tx_type, details = "Unknown", {}
-                            sender = "unknown"
-
-                        new_tx = Transaction(
-                            tx_hash=tx_hash,
-                            height=h,
-                            sender=sender,
-                            amount=0,
-                            tx_type=tx_type, 
-                            details=details, 
-                            timestamp=datetime.now()
-                        )
-                        
-                        try:
-                            session.merge(new_tx) 
-                            session.commit()
-                            print(f"   Saved: {tx_type} | {tx_hash[:10]}...")
-                        except Exception as db_err:
-                            session.rollback()
-                            print(f"   DB Error: {db_err}")
-
-                    except Exception as e:
-                        print(f"   Parsing Error: {e}")
-                        continue
+            self.save_block(session, h, data)
             
             await asyncio.sleep(0.5)
 
-if __name__ == "__main__":
-    indexer = BabylonIndexer()
+    # --- SUBSCRIPTION MODE ---
+
+    def parse_new_block_event(self, message):
+        """
+        Extract (height, tx_count) from a CometBFT NewBlock event.
+        Returns (None, 0) for the subscribe ack and anything that is not a block.
+        """
+        try:
+            value = message.get('result', {}).get('data', {}).get('value', {})
+            block = value.get('block')
+            if not block:
+                return None, 0
+            height = int(block['header']['height'])
+            txs = (block.get('data') or {}).get('txs') or []
+            return height, len(txs)
+        except Exception as e:
+            print(f"Event Error: {e}")
+            return None, 0
+
+    async def ingest_height(self, session, h, num_txs=None):
+        """
+        Store block h once a REST node returns all num_txs of its transactions.
+
+        Right after a NewBlock event the REST side has often not indexed the height yet
+        (or a lagging backup node answers), so short answers are retried with backoff
+        across nodes. num_txs=None (gap repair) reads the count from the block first.
+        Returns False if the block could not be verified; the caller must not move past it.
+        """
+        delay = self.retry_delay
+        for attempt in range(self.ingest_attempts):
+            if num_txs is None:
+                num_txs = await self.fetch_block_tx_count(h)
+            # Empty blocks need no txs call at all
+            if num_txs == 0:
+                return True
+            if num_txs is not None:
+                data = await self.fetch_txs(h)
+                got = len((data or {}).get('tx_responses') or [])
+                if got >= num_txs:
+                    self.save_block(session, h, data)
+                    return True
+                print(f"   Block {h}: node returned {got}/{num_txs} txs, retrying...")
+
+            if len(self.NODES) > 1:
+                self.switch_node()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+        print(f"   Could not ingest block {h}; it will be retried as part of gap repair.")
+        return False
+
+    async def backfill(self, session, last_height, target_height):
+        """
+        Repair the gap (last_height, target_height] over REST.
+        Returns the last height actually stored, which stops short at the first failure.
+        """
+        if target_height - last_height > 0:
+            print(f"\nRepairing gap: blocks {last_height + 1} to {target_height}")
+        for h in range(last_height + 1, target_height + 1):
+            if not await self.ingest_height(session, h):
+                return h - 1
+        return max(last_height, target_height)
+
+    async def subscribe(self):
+        """
+        Follow the chain tip from the node's websocket event stream instead of polling.
+        Missed heights (skipped events or time spent disconnected) are repaired over REST.
+        """
+        import websockets
+
+        session = self.Session()
+        last_height = None
+        backoff = 1
+
+        while True:
+            try:
+                async with websockets.connect(self.WS_URL, ping_interval=20, ping_timeout=20) as ws:
+                    await ws.send(json.dumps(SUBSCRIBE_NEW_BLOCK))
+                    print(f"Subscribed to new blocks on {self.WS_URL}")
+                    backoff = 1
+
+                    if last_height is not None:
+                        latest = await self.fetch_latest_block()
+                        if latest:
+                            last_height = await self.backfill(session, last_height, latest)
+
+                    async for raw in ws:
+                        h, num_txs = self.parse_new_block_event(json.loads(raw))
+                        if h is None:
+                            continue
+                        if last_height is None:
+                            last_height = h - 1
+                        if h <= last_height:
+                            continue
+                        if h > last_height + 1:
+                            last_height = await self.backfill(session, last_height, h - 1)
+                            if last_height < h - 1:
+                                # Gap still open; the next event retries it before moving on
+                                continue
+
+                        print(f"New Block {h} ({num_txs} txs)", end="\r")
+                        if await self.ingest_height(session, h, num_txs):
+                            last_height = h
+
+                raise ConnectionError("event stream closed by node")
+            except Exception as e:
+                print(f"\nSubscription lost ({e}). Reconnecting in {backoff}s...")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    # --- OFFLINE REPLAY ---
+
+    def write_rows(self, rows):
+        """Bulk upsert decoded rows on tx_hash (replay path; the live path keeps per-row merge)"""
+        if not rows:
+            return
+        # One INSERT cannot upsert the same key twice
+        rows = list({row['tx_hash']: row for row in rows}.values())
+        stmt = insert(Transaction).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Transaction.tx_hash],
+            set_={col: stmt.excluded[col] for col in ('height', 'sender', 'amount', 'tx_type', 'details', 'timestamp')}
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+
+    def replay(self, start=None, end=None, workers=None, batch_size=2000):
+        """
+        Re-run decode and write for every archived height in [start, end] without touching
+        the network. Blocks are decoded in parallel across processes and written in batches.
+        """
+        if self.raw_archive is None:
+            raise ValueError("replay needs a raw block archive (--archive-dir or RAW_ARCHIVE_DIR)")
+
+        Base.metadata.create_all(self.engine)
+        heights = self.raw_archive.heights(start, end)
+        print(f"Replaying {len(heights)} archived blocks from {self.raw_archive.root}...")
+
+        # Heights whose response is the shared empty-block object decode to nothing
+        jobs = [
+            (self.raw_archive.root, h, self.raw_archive.index[h])
+            for h in heights if not self.raw_archive.is_empty(h)
+        ]
+        print(f"{len(jobs)} blocks have transactions to decode.")
+        pending = []
+        written = 0
+
+        # Submit in bounded windows so neither futures nor decoded rows pile up
+        # when writing is slower than decoding
+        window = (workers or os.cpu_count() or 1) * 64
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for offset in range(0, len(jobs), window):
+                for rows in pool.map(decode_archived_block, jobs[offset:offset + window], chunksize=16):
+                    pending.extend(rows)
+                    if len(pending) >= batch_size:
+                        self.write_rows(pending)
+                        written += len(pending)
+                        pending = []
+                print(f"Replayed {min(offset + window, len(jobs))}/{len(jobs)} blocks, {written} txs written", end="\r")
+
+        self.write_rows(pending)
+        written += len(pending)
+        print(f"\nReplay complete: {len(jobs)} blocks, {written} txs written.")
+
+        # Replay rewrites rows in place (same ids), which an id-based columnar sync never sees
+        from analytics.columnar import columnar_enabled, get_columnar_store
+
+        if columnar_enabled():
+            columnar = get_columnar_store(self.engine)
+            if columnar:
+                print(f"Resynced {columnar.resync(start, end)} rows into the columnar store.")
+            else:
+                print("Run 'python analytics/columnar.py resync' to refresh the columnar store.")
+        return written
+
+def decode_archived_block(job):
+    """Worker for replay: load one archived response and decode it (runs in a child process)"""
+    root, h, digest = job
+    return BabylonIndexer.build_rows(h, RawBlockArchive.load_object(root, digest))
+
+@click.command()
+@click.option("--mode", type=click.Choice(["scan", "subscribe", "replay"]), default="scan", show_default=True,
+              help="scan: walk back from the tip over REST. subscribe: follow new blocks over websocket. "
+                   "replay: rebuild from the raw block archive, offline.")
+@click.option("--ws-url", default=None, help="CometBFT websocket endpoint (overrides BABYLON_WS_URL).")
+@click.option("--rest-url", default=None, help="Use this REST endpoint instead of the public node list.")
+@click.option("--archive-dir", default=None, envvar="RAW_ARCHIVE_DIR",
+              help="Store raw block responses here while indexing; required for replay.")
+@click.option("--from-height", type=int, default=None, help="Replay: first height.")
+@click.option("--to-height", type=int, default=None, help="Replay: last height.")
+@click.option("--workers", type=int, default=None, help="Replay: decode processes (default: all cores).")
+def main(mode, ws_url, rest_url, archive_dir, from_height, to_height, workers):
+    nodes = [rest_url] if rest_url else None
+    raw_archive = RawBlockArchive(archive_dir) if archive_dir else None
+    indexer = BabylonIndexer(nodes=nodes, ws_url=ws_url, raw_archive=raw_archive)
     try:
-        asyncio.run(indexer.run())
+        if mode == "replay":
+            indexer.replay(from_height, to_height, workers=workers)
+        else:
+            asyncio.run(indexer.subscribe() if mode == "subscribe" else indexer.run())
     except KeyboardInterrupt:
-        print("\nStopped by user.")
\ No newline at end of file
+        print("\nStopped by user.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import websockets
+
+SUBSCRIBE_ACK = {"jsonrpc": "2.0", "id": 1, "result": {}}
+
+
+class FakeNode:
+    """
+    Local stand-in for a Babylon node, for exercising the indexer's subscription mode.
+
+    Serves the REST endpoints the indexer uses (latest block, block by height, txs by
+    height, paginated at 100 txs per page) over HTTP and a CometBFT-style /websocket event stream. Each websocket
+    connection plays the next script from `sessions`; a script is a list of heights
+    (sent as NewBlock events), raw dict messages, or ("tip", h) to advance the chain
+    silently. Every connection but the last is closed by the node when its script ends.
+    """
+
+    def __init__(self, blocks, tip, sessions, lag=None):
+        self.blocks = blocks  # height -> number of txs
+        self.tip = tip
+        self.sessions = sessions
+        self.lag = dict(lag or {})  # height -> txs queries answered empty before the real answer
+        self.lagged_queries = 0
+        self.connections = 0
+        self._http = None
+        self._ws = None
+
+    # --- Payloads ---
+
+    def tx_hashes(self, h):
+        return [f"TX{h}_{i}" for i in range(self.blocks.get(h, 0))]
+
+    def block_json(self, h):
+        txs = ["dHg=" for _ in range(self.blocks.get(h, 0))]
+        return {"block": {"header": {"height": str(h)}, "data": {"txs": txs}}}
+
+    def txs_json(self, h, page=1, limit=100):
+        # Paginated like the SDK: at most `limit` txs per page, plus the overall total
+        indexes = range(self.blocks.get(h, 0))[(page - 1) * limit:page * limit]
+        bodies = [{
+            "body": {"messages": [{
+                "@type": "/cosmos.bank.v1beta1.MsgSend",
+                "from_address": "bbn1fakesender",
+                "to_address": f"bbn1fakerecipient{i}",
+                "amount": [{"denom": "ubbn", "amount": "1000000"}],
+            }]}
+        } for i in indexes]
+        hashes = self.tx_hashes(h)
+        responses = [
+            {"txhash": hashes[i], "height": str(h), "timestamp": "2025-01-01T00:00:00Z"}
+            for i in indexes
+        ]
+        return {"txs": bodies, "tx_responses": responses, "total": str(len(hashes))}
+
+    def new_block_event(self, h):
+        return {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "result": {
+                "query": "tm.event='NewBlock'",
+                "data": {"type": "tendermint/event/NewBlock", "value": self.block_json(h)},
+            },
+        }
+
+    # --- REST ---
+
+    def handle_rest(self, path, query):
+        prefix = "/cosmos/base/tendermint/v1beta1/blocks/"
+        if path == prefix + "latest":
+            return 200, self.block_json(self.tip)
+        if path.startswith(prefix):
+            h = int(path[len(prefix):])
+            return (200, self.block_json(h)) if h <= self.tip else (400, {"message": "height not available"})
+        if path == "/cosmos/tx/v1beta1/txs":
+            h = int(query.get("events", ["tx.height=0"])[0].split("=", 1)[1])
+            if h > self.tip:
+                return 400, {"message": "height not available"}
+            if self.lag.get(h, 0) > 0:
+                # Simulate a node that has the block but has not indexed its txs yet
+                self.lag[h] -= 1
+                self.lagged_queries += 1
+                return 200, {"txs": [], "tx_responses": [], "total": "0"}
+            page = int(query.get("page", ["1"])[0])
+            limit = min(int(query.get("limit", ["100"])[0]), 100)
+            return 200, self.txs_json(h, page, limit)
+        return 404, {"message": "not found"}
+
+    def _http_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, body = node.handle_rest(url.path, parse_qs(url.query))
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # --- Websocket ---
+
+    async def _handle_ws(self, ws, path=None):
+        await ws.recv()  # subscribe request
+        await ws.send(json.dumps(SUBSCRIBE_ACK))
+
+        index = self.connections
+        self.connections += 1
+        script = self.sessions[index] if index < len(self.sessions) else []
+
+        for step in script:
+            if isinstance(step, tuple) and step[0] == "tip":
+                self.tip = max(self.tip, step[1])
+            elif isinstance(step, dict):
+                await ws.send(json.dumps(step))
+            else:
+                self.tip = max(self.tip, step)
+                await ws.send(json.dumps(self.new_block_event(step)))
+
+        if index >= len(self.sessions) - 1:
+            await ws.wait_closed()
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        self._http = ThreadingHTTPServer(("127.0.0.1", 0), self._http_handler())
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        self._ws = await websockets.serve(self._handle_ws, "127.0.0.1", 0)
+        return self
+
+    async def stop(self):
+        self._ws.close()
+        await self._ws.wait_closed()
+        self._http.shutdown()
+
+    @property
+    def rest_url(self):
+        return f"http://127.0.0.1:{self._http.server_address[1]}"
+
+    @property
+    def ws_url(self):
+        port = list(self._ws.sockets)[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}/websocket"
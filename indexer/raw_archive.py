@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+
+def object_path(root, digest):
+    """Where the object with this sha256 lives inside an archive rooted at root"""
+    return os.path.join(root, "objects", digest[:2], f"{digest}.json.gz")
+
+
+class RawBlockArchive:
+    """
+    Local archive of raw /cosmos/tx/v1beta1/txs responses, keyed by height.
+
+    Responses are stored once per distinct content as gzip'd JSON under
+    objects/<sha256[:2]>/<sha256>.json.gz (empty blocks all share one object), and
+    an append-only index.tsv maps each height to its object. Objects for responses
+    without transactions are listed in empty.txt so replay can skip them unread.
+    Replaying from here needs no network at all.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.tsv")
+        self.empty_path = os.path.join(root, "empty.txt")
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index = self._load_index()
+        self.empty_objects = self._load_empty()
+
+    def _load_index(self):
+        index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) == 2:
+                        index[int(parts[0])] = parts[1]
+        return index
+
+    def _load_empty(self):
+        if not os.path.exists(self.empty_path):
+            return set()
+        with open(self.empty_path, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def is_empty(self, height):
+        """True when the archived response for this height has no transactions"""
+        return self.index.get(height) in self.empty_objects
+
+    def has(self, height):
+        return height in self.index
+
+    def heights(self, start=None, end=None):
+        return sorted(
+            h for h in self.index
+            if (start is None or h >= start) and (end is None or h <= end)
+        )
+
+    def put(self, height, data):
+        raw = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        path = object_path(self.root, digest)
+
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.tmp"
+                with gzip.open(tmp, "wb") as f:
+                    f.write(raw)
+                os.replace(tmp, path)
+
+            if not (data or {}).get('tx_responses') and digest not in self.empty_objects:
+                with open(self.empty_path, "a", encoding="utf-8") as f:
+                    f.write(f"{digest}\n")
+                self.empty_objects.add(digest)
+
+            if self.index.get(height) != digest:
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    f.write(f"{height}\t{digest}\n")
+                self.index[height] = digest
+        return digest
+
+    def get(self, height):
+        digest = self.index.get(height)
+        if digest is None:
+            return None
+        return self.load_object(self.root, digest)
+
+    @staticmethod
+    def load_object(root, digest):
+        """Read one object without an archive instance (used by replay worker processes)"""
+        with gzip.open(object_path(root, digest), "rb") as f:
+            return json.loads(f.read())
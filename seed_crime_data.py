@@ -1,10 +1,11 @@
 import requests
-import pandas as pd
 import time
-from sqlalchemy import create_engine
+from datetime import datetime
+from sqlalchemy import create_engine, text
 import os
 from dotenv import load_dotenv
 import json
+from database.schema import Base, Transaction
 
 load_dotenv()
 
@@ -72,23 +73,19 @@ def parse_tx(tx_response):
         elif 'voter' in first_msg: sender = first_msg['voter']
         elif 'signer' in first_msg: sender = first_msg['signer']
             
-        amount = 0.0
+        # Stored as the raw integer in the coin's base unit (ubbn), which the
+        # BigInteger column holds exactly; readers convert with UBBN_PER_BBN
+        amount = 0
         amt_obj = first_msg.get('amount')
         
         if isinstance(amt_obj, list) and len(amt_obj) > 0:
             amt_obj = amt_obj[0]
             
         if isinstance(amt_obj, dict):
-            raw_val = float(amt_obj.get('amount', 0))
-            denom = amt_obj.get('denom', 'ubbn')
-            
-            if denom == 'ubbn':
-                amount = raw_val / 1_000_000
-            else:
-                amount = raw_val 
+            amount = int(amt_obj.get('amount', 0))
 
         return {
-            "timestamp": timestamp,
+            "timestamp": datetime.fromisoformat(timestamp.replace('Z', '+00:00')).replace(tzinfo=None),
             "tx_hash": tx_hash,
             "sender": sender,
             "amount": amount,
@@ -122,6 +119,7 @@ def run_seed():
                 for tx in data['tx_responses']:
                     parsed = parse_tx(tx)
                     if parsed:
+                        parsed['height'] = h
                         all_txs.append(parsed)
             time.sleep(0.1) 
         except Exception:
@@ -129,8 +127,13 @@ def run_seed():
 
     if all_txs:
         print(f" Saving {len(all_txs)} transactions...")
-        df = pd.DataFrame(all_txs)
-        df.to_sql('transactions', engine, if_exists='replace', index=False)
+        # Keep the ORM schema (id, height, JSON details) that the dashboard feed and
+        # analytics rely on, instead of letting pandas recreate the table without them
+        rows = list({tx['tx_hash']: tx for tx in all_txs}.values())
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM transactions"))
+            conn.execute(Transaction.__table__.insert(), rows)
         print(" Database Updated!")
     else:
         print("No recent transactions found.")